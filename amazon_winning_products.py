@@ -1,93 +1,214 @@
 import requests
+import orjson
+import numpy as np
 import pandas as pd
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # ---------------- LOAD ENV ----------------
 load_dotenv()
 API_KEY = os.getenv("RAINFOREST_API_KEY")
+RAINFOREST_URL = "https://api.rainforestapi.com/request"
+PRICE_NOISE = re.compile(r"[₹$€£,\s]")
+DOT_DECIMAL_PRICE = re.compile(r"\D*(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?\D*")
+
+# ---------------- HTTP SESSION ----------------
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False
+    )
+))
 
 
 def competition_level(reviews):
-    if reviews < 200:
-        return "Low"
-    elif reviews < 1000:
-        return "Medium"
-    return "High"
+    reviews = np.asarray(reviews)
+    return np.select(
+        [reviews < 200, reviews < 1000],
+        ["Low", "Medium"],
+        default="High"
+    )
+
+
+def _to_float(value):
+    if isinstance(value, str):
+        value = PRICE_NOISE.sub("", value)
+
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+    return value if np.isfinite(value) else 0.0
+
+
+def _price_value(price_info):
+    if "value" in price_info:
+        return _to_float(price_info["value"])
+
+    # price.raw follows the marketplace locale; once separators are stripped
+    # only "1,299.00"-style strings are unambiguous, so "1.299,00 €" is skipped.
+    raw = price_info.get("raw")
+    if isinstance(raw, str) and DOT_DECIMAL_PRICE.fullmatch(raw.strip()):
+        return _to_float(raw)
 
+    return 0.0
 
-def get_amazon_top_products(keyword, marketplace="amazon.in", max_results=10):
+
+def fetch_search_page(keyword, marketplace="amazon.in", page=1):
     params = {
         "api_key": API_KEY,
         "type": "search",
         "amazon_domain": marketplace,
         "search_term": keyword,
-        "page": 1
+        "page": page,
+        "include_fields": "search_results"
     }
 
-    response = requests.get(
-        "https://api.rainforestapi.com/request",
-        params=params
-    )
+    try:
+        response = _SESSION.get(RAINFOREST_URL, params=params, timeout=10)
+    except requests.RequestException as exc:
+        print(f"⚠️ Rainforest request failed for '{keyword}' (page {page}): {exc}")
+        return []
 
-    data = response.json()
+    try:
+        data = orjson.loads(response.content)
+    except orjson.JSONDecodeError:
+        return []
 
-    if "search_results" not in data:
-        print("⚠️ No search results found. Check API key or keyword.")
-        return pd.DataFrame()
+    if not isinstance(data, dict):
+        return []
+
+    return data.get("search_results") or []
+
+
+def get_amazon_top_products(keyword, marketplace="amazon.in", max_results=10, pages=1):
+    df = get_amazon_top_products_many([keyword], marketplace, max_results, pages)
+
+    if df.empty:
+        return df
+
+    return df.drop(columns="Keyword")
 
-    rows = []
 
-    for product in data["search_results"][:max_results]:
-        title = product.get("title", "N/A")
-        price = product.get("price", {}).get("value", 0)
-        currency = product.get("price", {}).get("currency", "INR")
-        rating = product.get("rating", 0)
-        reviews = product.get("reviews_total", 0)
-        link = product.get("link", "")
+def rank_products(search_results, max_results=10):
+    search_results = search_results[:max_results]
 
-        rows.append({
-            "Product Title": title,
-            "Price": price,
-            "Currency": currency,
-            "Rating": rating,
-            "Reviews": reviews,
-            "Competition": competition_level(reviews),
-            "Link": link
-        })
+    titles, prices, currencies, ratings, reviews, links = [], [], [], [], [], []
 
-    df = pd.DataFrame(rows)
+    for product in search_results:
+        price_info = product.get("price") or {}
+
+        titles.append(product.get("title", "N/A"))
+        prices.append(_price_value(price_info))
+        currencies.append(price_info.get("currency", "INR"))
+        ratings.append(_to_float(product.get("rating")))
+        reviews.append(_to_float(product.get("reviews_total")))
+        links.append(product.get("link", ""))
+
+    df = pd.DataFrame({
+        "Product Title": titles,
+        "Price": np.array(prices, dtype=np.float32),
+        "Currency": currencies,
+        "Rating": np.array(ratings, dtype=np.float32),
+        "Reviews": np.array(reviews, dtype=np.int32),
+        "Link": links
+    })
+    df.insert(5, "Competition", competition_level(df["Reviews"]))
 
     # ---------------- SMART SCORE ----------------
-    max_price = max(df["Price"].max(), 1)
+    # Compute in float64 so the printed score and margins carry no float32
+    # representation noise, matching the app's Scale Score.
+    price_arr = df["Price"].to_numpy(dtype=np.float64)
+    rating_arr = df["Rating"].to_numpy(dtype=np.float64)
+    review_arr = df["Reviews"].to_numpy(dtype=np.float64)
+    title_len = df["Product Title"].str.len().to_numpy()
+    max_price = max(price_arr.max(), 1)
 
     df["Winning Score"] = (
-        (df["Rating"] * 0.25) +
-        (df["Reviews"].apply(lambda x: min(x / 5000, 1)) * 0.25) +
-        ((1 - (df["Price"] / max_price)) * 0.20) +
-        (df["Product Title"].str.len().apply(lambda x: 1 if x < 80 else 0.5) * 0.15) +
-        (df["Reviews"].apply(lambda x: 1 if x < 500 else 0.4) * 0.15)
+        (rating_arr * 0.25) +
+        (np.minimum(review_arr / 5000, 1) * 0.25) +
+        ((1 - (price_arr / max_price)) * 0.20) +
+        (np.where(title_len < 80, 1, 0.5) * 0.15) +
+        (np.where(review_arr < 500, 1, 0.4) * 0.15)
     ) * 100
 
     # ---------------- BUSINESS METRICS ----------------
-    df["Estimated Margin"] = (df["Price"] * 0.35).round(2)
-    df["Suggested Sourcing Cost"] = (df["Price"] * 0.45).round(2)
+    df["Estimated Margin"] = (price_arr * 0.35).round(2)
+    df["Suggested Sourcing Cost"] = (price_arr * 0.45).round(2)
 
     return df.sort_values("Winning Score", ascending=False)
 
 
+def get_amazon_top_products_many(keywords, marketplace="amazon.in", max_results=10, pages=1):
+    keywords = list(dict.fromkeys(keywords))
+
+    if not keywords:
+        return pd.DataFrame()
+
+    # Every (keyword, page) request goes through one pool capped at 8 workers,
+    # so concurrency never exceeds the session's pool size and connections
+    # are reused instead of discarded.
+    jobs = [(keyword, page) for keyword in keywords for page in range(1, max(pages, 1) + 1)]
+
+    with ThreadPoolExecutor(max_workers=min(len(jobs), 8)) as pool:
+        page_results = list(pool.map(
+            lambda job: fetch_search_page(job[0], marketplace, job[1]),
+            jobs
+        ))
+
+    search_results = {keyword: [] for keyword in keywords}
+    for (keyword, _), results in zip(jobs, page_results):
+        search_results[keyword].extend(results)
+
+    frames = []
+
+    for keyword, results in search_results.items():
+        if not results:
+            print(f"⚠️ No search results found for '{keyword}'. Check API key or keyword.")
+            continue
+
+        frames.append(rank_products(results, max_results).assign(Keyword=keyword))
+
+    if not frames:
+        return pd.DataFrame()
+
+    df = pd.concat(frames, ignore_index=True)
+    return df[["Keyword"] + [col for col in df.columns if col != "Keyword"]]
+
+
 # ---------------- CLI MODE ----------------
 if __name__ == "__main__":
-    keyword = input("Enter product keyword: ")
-
-    df = get_amazon_top_products(
-        keyword=keyword,
+    keywords = [
+        k.strip()
+        for k in input("Enter product keyword(s), comma-separated: ").split(",")
+        if k.strip()
+    ]
+
+    if not keywords:
+        print("⚠️ Enter at least one product keyword.")
+        raise SystemExit(1)
+
+    df = get_amazon_top_products_many(
+        keywords=keywords,
         marketplace="amazon.in",
         max_results=10
     )
 
     if not df.empty:
-        print(df[[
+        display_price = df["Currency"].str.cat(df["Price"].round(2).astype(str), sep=" ")
+
+        print(df.assign(Price=display_price)[[
+            "Keyword",
             "Product Title",
             "Price",
             "Rating",
@@ -96,5 +217,5 @@ if __name__ == "__main__":
             "Winning Score"
         ]])
 
-        df.to_csv("winning_products.csv", index=False)
+        df.to_csv("winning_products.csv", index=False, lineterminator="\n", encoding="utf-8")
         print("\n✅ Saved to winning_products.csv")
@@ -1,6 +1,8 @@
+import re
 import streamlit as st
+import altair as alt
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 from pytrends.request import TrendReq
 from urllib.parse import quote_plus
 
@@ -40,6 +42,8 @@ st.caption(
 )
 
 # ---------------- SIDEBAR ----------------
+NICHE_PATTERN = re.compile(r"^[\w\s\-'&.,+]{2,64}$")
+
 st.sidebar.header("🎯 Product Discovery")
 niche = st.sidebar.text_input(
     "Enter Niche",
@@ -47,48 +51,50 @@ niche = st.sidebar.text_input(
 )
 
 # ---------------- REAL COLLECTION ----------------
-def fetch_related_products(keyword):
-    try:
-        pytrends = TrendReq(hl="en-US", tz=330)
-        pytrends.build_payload([keyword], timeframe="today 12-m", geo="IN")
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def load_related_queries(keyword):
+    pytrends = TrendReq(hl="en-US", tz=330)
+    pytrends.build_payload([keyword], timeframe="today 12-m", geo="IN")
 
-        related = pytrends.related_queries()
+    related = pytrends.related_queries()
 
-        if keyword not in related:
-            return []
+    if keyword not in related:
+        return []
 
-        rising = related[keyword]["rising"]
-        top = related[keyword]["top"]
+    rising = related[keyword]["rising"]
+    top = related[keyword]["top"]
 
-        final_products = []
+    final_products = []
 
-        if rising is not None:
-            final_products.extend(rising["query"].tolist())
+    if rising is not None:
+        final_products.extend(rising["query"].tolist())
 
-        if top is not None:
-            final_products.extend(top["query"].tolist())
+    if top is not None:
+        final_products.extend(top["query"].tolist())
 
-        return list(dict.fromkeys(final_products))[:100]
+    return list(dict.fromkeys(final_products))[:100]
 
+def fetch_related_products(keyword):
+    # Failures raise out of the cached loader, so they are never cached
+    # and the next rerun retries Google Trends.
+    try:
+        return load_related_queries(keyword)
     except Exception:
         return []
 
 # ---------------- FILTER ----------------
-def filter_product_keywords(products):
-    blocked_words = [
-        "near me", "salon", "parlour", "clinic", "service",
-        "course", "training", "job", "tips", "routine",
-        "spa", "academy"
-    ]
-
-    final_products = []
+def keyword_pattern(keywords):
+    return re.compile("|".join(re.escape(k) for k in keywords))
 
-    for p in products:
-        text = p.lower()
-        if not any(b in text for b in blocked_words):
-            final_products.append(p)
+BLOCKED_WORDS = [
+    "near me", "salon", "parlour", "clinic", "service",
+    "course", "training", "job", "tips", "routine",
+    "spa", "academy"
+]
+BLOCKED_PATTERN = keyword_pattern(BLOCKED_WORDS)
 
-    return final_products
+def filter_product_keywords(products):
+    return [p for p in products if not BLOCKED_PATTERN.search(p.lower())]
 
 # ---------------- FALLBACK ----------------
 def niche_fallback_products(niche):
@@ -104,36 +110,35 @@ def niche_fallback_products(niche):
 
     return generated[:100]
 
+# ---------------- AMAZON LINK ----------------
+def amazon_search_link(product_name):
+    return f"https://www.amazon.in/s?k={quote_plus(product_name)}"
+
 # ---------------- EXACT LISTING ----------------
 def pick_exact_listing(product_name):
     exact_title = f"{product_name.title()} - Premium Bestseller"
-    link = f"https://www.amazon.in/s?k={quote_plus(product_name)}"
+    link = amazon_search_link(product_name)
     price = 599
     rating = 4.4
     reviews = 2500
     return exact_title, link, price, rating, reviews
 
 # ---------------- SCORE ENGINE ----------------
-def generate_marketing_scores(name):
-    name = name.lower()
-
-    wow = 5
-    problem = 5
-    impulse = 5
-    hook = 5
+PROBLEM_KEYWORDS = ["remover", "cleaner", "massager", "patch"]
+WOW_KEYWORDS = ["light", "mask", "smart", "projector"]
+PROBLEM_PATTERN = keyword_pattern(PROBLEM_KEYWORDS)
+WOW_PATTERN = keyword_pattern(WOW_KEYWORDS)
 
-    if any(k in name for k in ["remover", "cleaner", "massager", "patch"]):
-        problem += 4
-        impulse += 2
+def generate_marketing_scores(names):
+    names = pd.Series(names, dtype=object).str.lower()
 
-    if any(k in name for k in ["light", "mask", "smart", "projector"]):
-        wow += 4
-        hook += 4
+    problem_hit = names.str.contains(PROBLEM_PATTERN).to_numpy(dtype=np.int8)
+    wow_hit = names.str.contains(WOW_PATTERN).to_numpy(dtype=np.int8)
 
-    wow = min(wow, 10)
-    problem = min(problem, 10)
-    impulse = min(impulse, 10)
-    hook = min(hook, 10)
+    wow = np.minimum(5 + 4 * wow_hit, 10)
+    problem = np.minimum(5 + 4 * problem_hit, 10)
+    impulse = np.minimum(5 + 2 * problem_hit, 10)
+    hook = np.minimum(5 + 4 * wow_hit, 10)
 
     score = (
         wow * 0.30 +
@@ -142,14 +147,15 @@ def generate_marketing_scores(name):
         hook * 0.20
     ) * 10
 
-    return wow, problem, impulse, hook, round(score, 2)
+    return wow, problem, impulse, hook, np.round(score, 2)
 
 def trend_label(score):
-    if score > 80:
-        return "🚀 Breakout"
-    elif score > 60:
-        return "📈 Rising"
-    return "📉 Stable"
+    score = np.asarray(score)
+    return np.select(
+        [score > 80, score > 60],
+        ["🚀 Breakout", "📈 Rising"],
+        default="📉 Stable"
+    )
 
 def offer_engine(score):
     if score > 80:
@@ -158,7 +164,46 @@ def offer_engine(score):
         return "20% Launch Discount"
     return "Free Shipping Offer"
 
+# ---------------- DISCOVERY TABLE ----------------
+@st.cache_data(ttl=300, show_spinner=False)
+def build_discovery_df(products):
+    wow, problem, impulse, hook, scale_score = generate_marketing_scores(products)
+
+    df = pd.DataFrame({
+        "Product": list(products),
+        "Product Link": [amazon_search_link(p) for p in products],
+        "Wow": wow,
+        "Problem": problem,
+        "Impulse": impulse,
+        "Hook": hook,
+        "Scale Score": scale_score,
+        "Trend": trend_label(scale_score)
+    })
+
+    return df.sort_values("Scale Score", ascending=False).reset_index(drop=True)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def build_research_csv(products):
+    return build_discovery_df(products).to_csv(index=False).encode("utf-8")
+
+# ---------------- SCORE CHART ----------------
+def creative_score_chart(metrics, scores):
+    score_df = pd.DataFrame({"Metric": metrics, "Score": scores})
+
+    bars = alt.Chart(
+        score_df, title="Creative Performance Potential"
+    ).mark_bar().encode(
+        x=alt.X("Metric", sort=None),
+        y=alt.Y("Score", scale=alt.Scale(domain=[0, 10]))
+    )
+    labels = bars.mark_text(dy=-8, fontWeight="bold").encode(text="Score")
+    return bars + labels
+
 # ---------------- MAIN ----------------
+if niche and not NICHE_PATTERN.match(niche):
+    st.error("⚠️ Enter a niche of 2-64 characters: letters, numbers, spaces or - ' & . , +")
+    st.stop()
+
 if niche:
     raw_products = fetch_related_products(niche)
     products = filter_product_keywords(raw_products)
@@ -167,33 +212,18 @@ if niche:
         products = niche_fallback_products(niche)
 
     if products:
-        discovery_rows = []
-
-        for product in products:
-            wow, problem, impulse, hook, scale_score = generate_marketing_scores(product)
-
-            product_link = f"https://www.amazon.in/s?k={quote_plus(product)}"
-
-            discovery_rows.append({
-                "Product": product,
-                "Product Link": product_link,
-                "Wow": wow,
-                "Problem": problem,
-                "Impulse": impulse,
-                "Hook": hook,
-                "Scale Score": scale_score,
-                "Trend": trend_label(scale_score)
-            })
-
-        df = pd.DataFrame(discovery_rows)
-        df = df.sort_values("Scale Score", ascending=False).reset_index(drop=True)
+        df = build_discovery_df(tuple(products))
 
         # ---------------- KPI ROW ----------------
+        # df is already sorted by Scale Score, so one value_counts pass
+        # covers both trend KPIs and the top score is the first row.
+        trend_counts = df["Trend"].value_counts()
+
         k1, k2, k3, k4 = st.columns(4)
         k1.metric("📦 Products Found", len(df))
-        k2.metric("🚀 Top Score", round(df["Scale Score"].max(), 2))
-        k3.metric("📈 Rising", len(df[df["Trend"] == "📈 Rising"]))
-        k4.metric("🔥 Breakout", len(df[df["Trend"] == "🚀 Breakout"]))
+        k2.metric("🚀 Top Score", round(df["Scale Score"].iat[0], 2))
+        k3.metric("📈 Rising", int(trend_counts.get("📈 Rising", 0)))
+        k4.metric("🔥 Breakout", int(trend_counts.get("🚀 Breakout", 0)))
 
         # ---------------- TABS ----------------
         tab1, tab2, tab3 = st.tabs([
@@ -213,12 +243,15 @@ if niche:
                 height=500
             )
 
-            selected_product = st.selectbox(
+            selected_index = st.selectbox(
                 "🚀 Select Product to Launch",
-                df["Product"]
+                df.index,
+                format_func=lambda i: df.at[i, "Product"],
+                key=f"launch_product_{niche}"
             )
 
-        selected_row = df[df["Product"] == selected_product].iloc[0]
+        selected_row = df.loc[selected_index]
+        selected_product = selected_row["Product"]
 
         with tab2:
             exact_title, exact_link, exact_price, exact_rating, exact_reviews = pick_exact_listing(selected_product)
@@ -236,38 +269,27 @@ if niche:
 **Amazon Link:** {exact_link}
 """)
 
+            scores = selected_row[["Wow", "Problem", "Impulse", "Hook"]]
+
             c1, c2, c3, c4 = st.columns(4)
-            c1.metric("✨ Wow", selected_row["Wow"])
-            c2.metric("🧩 Problem", selected_row["Problem"])
-            c3.metric("🛒 Impulse", selected_row["Impulse"])
-            c4.metric("🎥 Hook", selected_row["Hook"])
-
-            score_df = pd.DataFrame({
-                "Metric": ["Wow", "Problem", "Impulse", "Hook"],
-                "Score": [
-                    selected_row["Wow"],
-                    selected_row["Problem"],
-                    selected_row["Impulse"],
-                    selected_row["Hook"]
-                ]
-            })
-
-            fig, ax = plt.subplots(figsize=(8, 4))
-            ax.bar(score_df["Metric"], score_df["Score"])
-            ax.set_ylim(0, 10)
-            ax.set_title("Creative Performance Potential")
-            plt.tight_layout()
-            st.pyplot(fig)
+            c1.metric("✨ Wow", scores["Wow"])
+            c2.metric("🧩 Problem", scores["Problem"])
+            c3.metric("🛒 Impulse", scores["Impulse"])
+            c4.metric("🎥 Hook", scores["Hook"])
+
+            chart = creative_score_chart(
+                tuple(scores.index), tuple(scores.to_numpy(dtype=float))
+            )
+            st.altair_chart(chart, use_container_width=True)
 
         with tab3:
+            offer = offer_engine(selected_row["Scale Score"])
             st.success(
                 f"📈 {selected_product} → {selected_row['Trend']} | "
-                f"Scale Score: {selected_row['Scale Score']}"
+                f"Scale Score: {selected_row['Scale Score']}  \n"
+                f"🎁 Recommended Offer: {offer}"
             )
 
-            offer = offer_engine(selected_row["Scale Score"])
-            st.success(f"🎁 Recommended Offer: {offer}")
-
             predicted_ctr = round(
                 (selected_row["Wow"] + selected_row["Hook"]) / 2 * 0.7, 2
             )
@@ -279,7 +301,7 @@ if niche:
             s1.metric("👆 Predicted CTR", f"{predicted_ctr}%")
             s2.metric("🚀 Predicted ROAS", f"{predicted_roas}x")
 
-            csv = df.to_csv(index=False).encode("utf-8")
+            csv = build_research_csv(tuple(products))
 
             st.download_button(
                 "📥 Download Research CSV",